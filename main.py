@@ -1,7 +1,460 @@
-from fastapi import FastAPI
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import jwt
+import orjson
+from cachetools import TTLCache
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
+
+SECRET_KEY = os.getenv("SECRET_KEY", "change-me-in-production-0123456789abcdef")
+# Encoded once so PyJWT doesn't re-derive key bytes on every call.
+SECRET_KEY_BYTES = SECRET_KEY.encode()
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+app = FastAPI(title="FastAPI Boilerplate")
+
+@app.middleware("http")
+async def stamp_request_time(request: Request, call_next):
+    # One clock read per request; handlers share it via request.state.now.
+    request.state.now = datetime.utcnow()
+    return await call_next(request)
+
+
+# A concrete allowlist lets Starlette take its fast-path origin check
+# instead of reflecting headers on every request (and a wildcard with
+# credentials is invalid per the CORS spec anyway).
+ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type"],
+)
+
+# OWASP-recommended argon2id parameters: 19 MiB memory, 2 iterations.
+ph = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+security = HTTPBearer()
+
+DB_PATH = os.getenv("DB_PATH", "app.db")
+
+# One connection per worker process, shared across the threadpool. WAL lets
+# readers run concurrently with the single writer, so multiple uvicorn
+# workers can share the same database file.
+conn = sqlite3.connect(
+    DB_PATH,
+    check_same_thread=False,
+    isolation_level=None,
+    detect_types=sqlite3.PARSE_DECLTYPES,
+)
+conn.row_factory = sqlite3.Row
+conn.execute("PRAGMA journal_mode=WAL")
+conn.execute("PRAGMA synchronous=NORMAL")
+conn.executescript(
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT NOT NULL,
+        password TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        price REAL NOT NULL,
+        owner_id INTEGER NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        version INTEGER NOT NULL DEFAULT 1
+    );
+    """
+)
+
+
+def _get_user_by_username(username: str) -> Optional[dict]:
+    row = conn.execute(
+        "SELECT * FROM users WHERE username = ?", (username,)
+    ).fetchone()
+    return dict(row) if row is not None else None
+
+
+def _insert_user(user_data: dict) -> int:
+    # RETURNING rather than lastrowid: lastrowid is connection-wide, so
+    # concurrent inserts on the shared connection could read each other's id.
+    row = conn.execute(
+        "INSERT INTO users (username, email, password, created_at)"
+        " VALUES (?, ?, ?, ?) RETURNING id",
+        (
+            user_data["username"],
+            user_data["email"],
+            user_data["password"],
+            user_data["created_at"],
+        ),
+    ).fetchone()
+    return row["id"]
+
+
+def _select_users(skip: int, limit: int) -> List[dict]:
+    rows = conn.execute(
+        "SELECT * FROM users ORDER BY id LIMIT ? OFFSET ?", (limit, skip)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _get_item(item_id: int) -> Optional[dict]:
+    row = conn.execute(
+        "SELECT * FROM items WHERE id = ?", (item_id,)
+    ).fetchone()
+    return dict(row) if row is not None else None
+
+
+def _insert_item(item_data: dict) -> int:
+    row = conn.execute(
+        "INSERT INTO items (title, description, price, owner_id, created_at)"
+        " VALUES (?, ?, ?, ?, ?) RETURNING id",
+        (
+            item_data["title"],
+            item_data["description"],
+            item_data["price"],
+            item_data["owner_id"],
+            item_data["created_at"],
+        ),
+    ).fetchone()
+    return row["id"]
+
+
+def _select_items(skip: int, limit: int) -> List[dict]:
+    rows = conn.execute(
+        "SELECT * FROM items ORDER BY id LIMIT ? OFFSET ?", (limit, skip)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _replace_item(item_data: dict) -> None:
+    conn.execute(
+        "UPDATE items SET title = ?, description = ?, price = ?,"
+        " version = version + 1 WHERE id = ?",
+        (
+            item_data["title"],
+            item_data["description"],
+            item_data["price"],
+            item_data["id"],
+        ),
+    )
+
+
+def _delete_item(item_id: int) -> None:
+    conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+
+
+# Verified-token cache: avoids re-running HMAC verification + JSON decode for
+# tokens that are reused within their lifetime. Keyed by a blake2b digest of
+# the raw token so tokens themselves are never stored.
+TOKEN_CACHE_TTL = 30
+_token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL)
+
+
+class UserBase(BaseModel):
+    username: str = Field(..., min_length=3, max_length=50)
+    email: EmailStr
+
+
+class UserCreate(UserBase):
+    password: str = Field(..., min_length=8)
+
+
+class UserLogin(BaseModel):
+    username: str
+    password: str
+
+
+class User(UserBase):
+    id: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+
+
+class ItemBase(BaseModel):
+    title: str = Field(..., min_length=1, max_length=100)
+    description: Optional[str] = Field(None, max_length=500)
+    price: float = Field(..., gt=0)
+
+
+class ItemCreate(ItemBase):
+    pass
+
+
+class Item(ItemBase):
+    id: int
+    owner_id: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Failure responses raised on hot paths, preallocated so a 401/403/404
+# doesn't rebuild the exception and its headers dict on every request.
+_UNAUTHORIZED = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_LOGIN_FAILED = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Incorrect username or password",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_FORBIDDEN = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
+)
+_ITEM_NOT_FOUND = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Item not found"
+)
+
+# Prebuilt serializers for the list endpoints. Stored rows are trusted
+# data from our own store, so we skip FastAPI's response-model re-validation
+# and dump straight to JSON bytes in pydantic-core; model_construct keeps
+# the field filtering (e.g. the password column never leaves the users
+# table) without a validation pass.
+_users_adapter = TypeAdapter(List[User])
+_items_adapter = TypeAdapter(List[Item])
+
+
+def get_password_hash(password: str) -> str:
+    return ph.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        ph.verify(hashed_password, plain_password)
+        return True
+    except VerifyMismatchError:
+        return False
+
+
+# Token minting bypasses PyJWT's per-call object construction: the header is
+# constant for HS256, so its base64 form is computed once, and the HMAC inner
+# state for the fixed key is reused via .copy(). jwt.decode still verifies
+# these tokens as usual.
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(
+    b"="
+)
+_HMAC_TEMPLATE = hmac.new(SECRET_KEY_BYTES, digestmod=hashlib.sha256)
+
+
+def _encode_jwt(payload: dict) -> str:
+    body = base64.urlsafe_b64encode(orjson.dumps(payload)).rstrip(b"=")
+    signing_input = _JWT_HEADER_B64 + b"." + body
+    h = _HMAC_TEMPLATE.copy()
+    h.update(signing_input)
+    signature = base64.urlsafe_b64encode(h.digest()).rstrip(b"=")
+    return (signing_input + b"." + signature).decode()
+
+
+def create_access_token(data: dict, now: Optional[datetime] = None) -> str:
+    to_encode = data.copy()
+    if now is None:
+        now = datetime.utcnow()
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # exp must be a numeric claim; utcnow() is naive, so pin it to UTC first.
+    to_encode["exp"] = int(expire.replace(tzinfo=timezone.utc).timestamp())
+    return _encode_jwt(to_encode)
+
+
+def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> dict:
+    cache_key = hashlib.blake2b(
+        credentials.credentials.encode(), digest_size=16
+    ).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        payload = jwt.decode(
+            credentials.credentials,
+            SECRET_KEY_BYTES,
+            algorithms=[ALGORITHM],
+            # We issue no aud/iss claims, so skip those checks.
+            options={"verify_aud": False, "verify_iss": False},
+        )
+        username = payload.get("sub")
+        if username is None:
+            raise _UNAUTHORIZED
+    except jwt.PyJWTError:
+        raise _UNAUTHORIZED
+    # This dependency is sync, so FastAPI already runs it (and this query)
+    # on the threadpool.
+    user = _get_user_by_username(username)
+    if user is None:
+        raise _UNAUTHORIZED
+    # Cache only successful verifications. TTLCache has a single cache-wide
+    # TTL, so skip tokens expiring within the cache window rather than risk
+    # serving a token past its own expiry. exp is UTC seconds, so compare
+    # against time.time() — .timestamp() on the naive request stamp would
+    # skew by the host's UTC offset.
+    remaining = payload["exp"] - time.time()
+    if remaining > TOKEN_CACHE_TTL:
+        _token_cache[cache_key] = user
+    return user
 
-app = FastAPI()
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to FastAPI Boilerplate!"}
+
+
+@app.get("/health")
+def health_check(request: Request, response: Response):
+    response.headers["Cache-Control"] = "max-age=1"
+    return {"status": "ok", "timestamp": request.state.now}
+
+
+# The write endpoints return model_construct instances: the payload was
+# validated on the way in and the rest of the row is our own data, so the
+# response-model validation pass is skipped (response_model=None).
+@app.post("/register", response_model=None, status_code=status.HTTP_201_CREATED)
+async def register(user: UserCreate, request: Request):
+    user_data = user.model_dump()
+    # Argon2 takes tens of milliseconds; run it on the threadpool so the
+    # event loop keeps serving other requests.
+    user_data["password"] = await run_in_threadpool(
+        get_password_hash, user.password
+    )
+    user_data["created_at"] = request.state.now
+    try:
+        user_data["id"] = await run_in_threadpool(_insert_user, user_data)
+    except sqlite3.IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already registered",
+        )
+    return User.model_construct(**user_data)
+
+
+@app.post("/login", response_model=Token)
+async def login(user_credentials: UserLogin, request: Request):
+    user = await run_in_threadpool(
+        _get_user_by_username, user_credentials.username
+    )
+    if user is None:
+        # Unknown usernames (the bulk of credential-stuffing traffic) fail
+        # without burning an argon2 verify; sleep roughly one verify time so
+        # the response doesn't reveal whether the username exists.
+        await asyncio.sleep(0.05)
+        raise _LOGIN_FAILED
+    if not await run_in_threadpool(
+        verify_password, user_credentials.password, user["password"]
+    ):
+        raise _LOGIN_FAILED
+    access_token = create_access_token(
+        {"sub": user["username"]}, now=request.state.now
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
+@app.get("/users/me", response_model=User)
+async def read_users_me(current_user: dict = Depends(get_current_user)):
+    return current_user
+
+
+@app.get("/users")
+async def get_users(skip: int = 0, limit: int = 100) -> List[User]:
+    rows = await run_in_threadpool(_select_users, skip, limit)
+    users = [User.model_construct(**row) for row in rows]
+    return Response(
+        content=_users_adapter.dump_json(users),
+        media_type="application/json",
+    )
+
+
+@app.post("/items/", response_model=None, status_code=status.HTTP_201_CREATED)
+async def create_item(
+    item: ItemCreate,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    item_data = item.model_dump()
+    item_data["owner_id"] = current_user["id"]
+    item_data["created_at"] = request.state.now
+    item_data["id"] = await run_in_threadpool(_insert_item, item_data)
+    return Item.model_construct(**item_data)
+
+
+@app.get("/items/")
+async def get_items(skip: int = 0, limit: int = 100) -> List[Item]:
+    rows = await run_in_threadpool(_select_items, skip, limit)
+    items = [Item.model_construct(**row) for row in rows]
+    return Response(
+        content=_items_adapter.dump_json(items),
+        media_type="application/json",
+    )
+
+
+@app.get("/items/{item_id}", response_model=Item)
+async def get_item(item_id: int, request: Request, response: Response):
+    item = await run_in_threadpool(_get_item, item_id)
+    if item is None:
+        raise _ITEM_NOT_FOUND
+    # The version column is bumped on every update, so id-version is a
+    # cheap validator: repeat viewers get a bodyless 304.
+    etag = f'W/"{item_id}-{item["version"]}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    response.headers["ETag"] = etag
+    return item
+
+
+@app.put("/items/{item_id}", response_model=None)
+async def update_item(
+    item_id: int,
+    item: ItemCreate,
+    current_user: dict = Depends(get_current_user),
+):
+    stored = await run_in_threadpool(_get_item, item_id)
+    if stored is None:
+        raise _ITEM_NOT_FOUND
+    if stored["owner_id"] != current_user["id"]:
+        raise _FORBIDDEN
+    item_data = item.model_dump()
+    item_data["id"] = item_id
+    item_data["owner_id"] = current_user["id"]
+    item_data["created_at"] = stored["created_at"]
+    await run_in_threadpool(_replace_item, item_data)
+    return Item.model_construct(**item_data)
+
+
+@app.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_item(
+    item_id: int, current_user: dict = Depends(get_current_user)
+):
+    stored = await run_in_threadpool(_get_item, item_id)
+    if stored is None:
+        raise _ITEM_NOT_FOUND
+    if stored["owner_id"] != current_user["id"]:
+        raise _FORBIDDEN
+    await run_in_threadpool(_delete_item, item_id)
@@ -0,0 +1,22 @@
+import os
+
+import uvicorn
+
+if __name__ == "__main__":
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8000"))
+    reload = os.getenv("RELOAD", "").lower() in {"1", "true", "yes"}
+    # uvloop + httptools are the biggest server-side throughput knobs for an
+    # I/O-bound app; access logging costs a write per request, so keep it off
+    # outside of debugging. For multi-core deployments front this with
+    # gunicorn -k uvicorn.workers.UvicornWorker -w $((2 * cores + 1)).
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        reload=reload,
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        log_level="warning",
+    )